@@ -9,9 +9,10 @@
 
 # ---------------- 1. IMPORTS ----------------
 import streamlit as st          # Web App Framework
-import qrcode                   # QR Code Generator
-from io import BytesIO          # Memory handling for images
 import uuid                     # Unique ID Generator
+import zipfile                  # Ticket bundle for download
+from io import BytesIO          # Memory handling for the bundle
+# qr_utils (and segno with it) is imported only once a booking is made
 
 # ---------------- 2. PAGE CONFIGURATION ----------------
 st.set_page_config(
@@ -22,46 +23,38 @@ st.set_page_config(
 
 # ---------------- 3. HELPER FUNCTIONS ----------------
 
-def generate_qr_code(ticket_text: str) -> BytesIO:
+def build_ticket_bundle(ticket_text: str, file_base: str) -> bytes:
     """
-    Generates a QR code image from the provided text.
-    Returns: An in-memory image buffer (BytesIO).
+    Packs the ticket receipt (TXT) and its QR code (PNG) into one ZIP.
+    Returns: The ZIP archive as raw bytes.
     """
-    qr = qrcode.QRCode(
-        version=1,
-        box_size=10,
-        border=4
-    )
-    qr.add_data(ticket_text)
-    qr.make(fit=True)
+    from qr_utils import generate_qr_code
 
-    img = qr.make_image(fill_color="black", back_color="white")
-    
+    # ZIP_STORED: the PNG is already compressed and the text is tiny,
+    # so deflating the entries would cost CPU for almost no saving.
     buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
-    
-    return buffer
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as bundle:
+        bundle.writestr(f"{file_base}.png", generate_qr_code(ticket_text))
+        bundle.writestr(f"{file_base}.txt", ticket_text)
+
+    return buffer.getvalue()
 
 # ---------------- 4. CONSTANTS & DATA ----------------
 METRO_PRICE = 30  # Flat rate per ticket
 
-# Cab rates per passenger
-CAB_RATES = {
-    "Mini": 40,
-    "Sedan": 60,
-    "SUV": 90
-}
+# Car types and their per-passenger cab rates, aligned by index
+CAR_TYPES = ("Mini", "Sedan", "SUV")
+CAR_RATES = (40, 60, 90)
 
-STATIONS = [
-    "Ameerpet", "KPHB", "Kukatpally", 
+STATIONS = (
+    "Ameerpet", "KPHB", "Kukatpally",
     "Madhapur", "Hitech City", "Raidurg"
-]
+)
 
-LOCATIONS = [
-    "Office", "Home", "Shopping Mall", 
+LOCATIONS = (
+    "Office", "Home", "Shopping Mall",
     "Hospital", "College", "Hotel"
-]
+)
 
 # ============================================================
 # MAIN USER INTERFACE
@@ -69,28 +62,11 @@ LOCATIONS = [
 
 def main():
     st.title("🏙️ UNIFIED CITY COMMUTE SYSTEM")
-    st.markdown("### Passenger Details")
-
-    passenger_name = st.text_input("Passenger Name", placeholder="Enter full name")
-
-    # --- Section 1: Metro Details ---
-    st.markdown("### 1. Metro Details")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        source_station = st.selectbox("Source Station", STATIONS)
-    with col2:
-        # Default destination set to 2nd item for convenience
-        destination_station = st.selectbox("Destination Station", STATIONS, index=1)
-
-    ticket_count = st.number_input("Number of Passengers", min_value=1, value=1)
-    
-    metro_fare = ticket_count * METRO_PRICE
-    st.info(f"🚇 Metro Fare: ₹{metro_fare}")
 
-    # --- Section 2: Cab Requirement ---
-    st.markdown("### 2. Cab Requirement")
-    st.write("Do you need a cab for the last mile?")
+    # --- Cab Requirement ---
+    # The toggle stays outside the form below: it decides which fields
+    # the form shows, so it is the one input that still reruns the page.
+    st.markdown("### Journey Type\nDo you need a cab for the last mile?")
 
     # Using Radio with horizontal=True ensures the menu stays open
     # without needing session_state complexity.
@@ -100,95 +76,139 @@ def main():
         horizontal=True,
         label_visibility="collapsed"
     )
+    need_cab = (cab_choice == "YES - Add Cab")
+
+    # Widgets inside a form are batched: editing them does not rerun
+    # the script until the booking is submitted.
+    with st.form("booking"):
+        st.markdown("### Passenger Details")
+
+        passenger_name = st.text_input("Passenger Name", placeholder="Enter full name")
+
+        # --- Section 1: Metro Details ---
+        st.markdown("### 1. Metro Details")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            source_station = st.selectbox("Source Station", STATIONS)
+        with col2:
+            # Default destination set to 2nd item for convenience
+            destination_station = st.selectbox("Destination Station", STATIONS, index=1)
+
+        ticket_count = st.number_input("Number of Passengers", min_value=1, value=1)
+
+        # --- Section 2: Cab Details ---
+        cab_drop = "N/A"
+        car_index = None
+
+        if need_cab:
+            st.markdown("### 2. 🚖 Cab Details")
+
+            # Pickup is auto-set to Metro Destination
+            st.caption("Pickup Location: your Metro destination station (auto-filled)")
+
+            cab_drop = st.selectbox("Drop Location", LOCATIONS)
+            # The selectbox returns the index, which maps straight onto CAR_RATES
+            car_index = st.selectbox(
+                "Select Car Type",
+                range(len(CAR_TYPES)),
+                format_func=CAR_TYPES.__getitem__
+            )
+
+        btn_text = "🎫 Book Metro & Cab" if need_cab else "🎫 Book Metro Only"
+        submitted = st.form_submit_button(btn_text, type="primary")
+
+    # --- Booking Logic ---
+    if not submitted:
+        return
+
+    # 1. Validation (before any fare math or ticket building)
+    if not passenger_name.strip():
+        st.error("⚠️ Passenger name is required.")
+        return
+    if source_station == destination_station:
+        st.error("⚠️ Source and Destination stations cannot be the same.")
+        return
+
+    metro_fare = ticket_count * METRO_PRICE
+    st.info(f"🚇 Metro Fare: ₹{metro_fare}")
 
     # Initialize Cab Variables
-    need_cab = (cab_choice == "YES - Add Cab")
     cab_pickup = "N/A"
-    cab_drop = "N/A"
     cab_fare = 0
     selected_car = "None"
 
     if need_cab:
-        st.markdown("#### 🚖 Cab Details")
-        
-        # Pickup is auto-set to Metro Destination
         cab_pickup = destination_station
-        st.text_input("Pickup Location (Auto-filled)", value=cab_pickup, disabled=True)
-        
-        cab_drop = st.selectbox("Drop Location", LOCATIONS)
-        selected_car = st.selectbox("Select Car Type", list(CAB_RATES.keys()))
-        
-        cab_fare = ticket_count * CAB_RATES[selected_car]
+        selected_car = CAR_TYPES[car_index]
+        cab_fare = ticket_count * CAR_RATES[car_index]
         st.info(f"🚖 Cab Fare ({selected_car}): ₹{cab_fare}")
 
     # --- Section 3: Final Totals ---
-    st.markdown("---")
+    # Divider and heading go out as one markdown element
     grand_total = metro_fare + cab_fare
-    st.markdown(f"### 💰 Grand Total: ₹{grand_total}")
+    st.markdown(f"---\n### 💰 Grand Total: ₹{grand_total}")
 
-    # --- Booking Logic ---
-    ticket_id = str(uuid.uuid4())[:8].upper()
-    btn_text = "🎫 Book Metro & Cab" if need_cab else "🎫 Book Metro Only"
+    # Only generated for an actual booking, not on every rerun.
+    # Top 32 bits of the UUID, formatted straight to 8 hex digits.
+    ticket_id = f"{uuid.uuid4().int >> 96:08X}"
 
-    if st.button(btn_text, type="primary"):
+    # 2. Ticket Text Construction
+    if need_cab:
+        ticket_text = (
+            f"UNIFIED TICKET\n"
+            f"-------------------------\n"
+            f"ID       : {ticket_id}\n"
+            f"Passenger: {passenger_name}\n"
+            f"-------------------------\n"
+            f"METRO: {source_station} -> {destination_station} (₹{metro_fare})\n"
+            f"-------------------------\n"
+            f"CAB ({selected_car}): {cab_pickup} -> {cab_drop} (₹{cab_fare})\n"
+            f"-------------------------\n"
+            f"TOTAL: ₹{grand_total}"
+        )
+    else:
+        ticket_text = (
+            f"METRO TICKET\n"
+            f"-------------------------\n"
+            f"ID       : {ticket_id}\n"
+            f"Passenger: {passenger_name}\n"
+            f"-------------------------\n"
+            f"METRO: {source_station} -> {destination_station}\n"
+            f"-------------------------\n"
+            f"TOTAL: ₹{metro_fare}"
+        )
+
+    # 3. Output Display
+    from qr_utils import generate_qr_svg
+
+    st.success("✅ Booking Confirmed Successfully")
+    file_base = f"Ticket_{ticket_id}"
+    
+    col_res1, col_res2 = st.columns([1.5, 1])
+    
+    with col_res1:
+        st.text_area("Ticket Receipt", ticket_text, height=200)
+        
+        # One bundle instead of separate TXT and PNG downloads. The
+        # payload is a callable, so the ZIP (and the PNG inside it) is
+        # only built when the user actually clicks.
+        st.download_button(
+            label="⬇ Download Ticket (ZIP)",
+            data=lambda: build_ticket_bundle(ticket_text, file_base),
+            file_name=f"{file_base}.zip",
+            mime="application/zip",
+            # A download shouldn't rerun the script and re-render
+            # (or wipe) the ticket that is already on screen
+            on_click="ignore"
+        )
         
-        # 1. Validation
-        if not passenger_name.strip():
-            st.error("⚠️ Passenger name is required.")
-        elif source_station == destination_station:
-            st.error("⚠️ Source and Destination stations cannot be the same.")
-        else:
-            # 2. Ticket Text Construction
-            if need_cab:
-                ticket_text = (
-                    f"UNIFIED TICKET\n"
-                    f"-------------------------\n"
-                    f"ID       : {ticket_id}\n"
-                    f"Passenger: {passenger_name}\n"
-                    f"-------------------------\n"
-                    f"METRO: {source_station} -> {destination_station} (₹{metro_fare})\n"
-                    f"-------------------------\n"
-                    f"CAB ({selected_car}): {cab_pickup} -> {cab_drop} (₹{cab_fare})\n"
-                    f"-------------------------\n"
-                    f"TOTAL: ₹{grand_total}"
-                )
-            else:
-                ticket_text = (
-                    f"METRO TICKET\n"
-                    f"-------------------------\n"
-                    f"ID       : {ticket_id}\n"
-                    f"Passenger: {passenger_name}\n"
-                    f"-------------------------\n"
-                    f"METRO: {source_station} -> {destination_station}\n"
-                    f"-------------------------\n"
-                    f"TOTAL: ₹{metro_fare}"
-                )
-
-            # 3. Output Display
-            st.success("✅ Booking Confirmed Successfully")
-            
-            col_res1, col_res2 = st.columns([1.5, 1])
-            
-            with col_res1:
-                st.text_area("Ticket Receipt", ticket_text, height=200)
-                
-                st.download_button(
-                    label="⬇ Download Details (TXT)",
-                    data=ticket_text,
-                    file_name=f"Ticket_{ticket_id}.txt",
-                    mime="text/plain"
-                )
-                
-            with col_res2:
-                qr_bytes = generate_qr_code(ticket_text)
-                st.image(qr_bytes, caption="Scan for Entry", width=150)
-                
-                st.download_button(
-                    label="⬇ QR Code (PNG)",
-                    data=qr_bytes,
-                    file_name=f"Ticket_{ticket_id}.png",
-                    mime="image/png"
-                )
+    with col_res2:
+        # Inline SVG travels inside the same message as the page, with
+        # no media file for the browser to fetch separately
+        qr_svg = generate_qr_svg(ticket_text)
+        st.markdown(f'<div style="width:150px">{qr_svg}</div>', unsafe_allow_html=True)
+        st.caption("Scan for Entry")
 
 # ============================================================
 # APP ENTRY POINT
@@ -0,0 +1,55 @@
+# ============================================================
+# QR CODE UTILITIES
+# ============================================================
+# Description:
+# Shared QR code helpers for the commute app. Kept in their own
+# module so Streamlit imports segno and defines the cached
+# function once, instead of on every rerun of the page script.
+# ============================================================
+
+# ---------------- 1. IMPORTS ----------------
+import streamlit as st          # Web App Framework (caching)
+import segno                    # QR Code Generator
+from io import BytesIO          # Memory handling for images
+
+# ---------------- 2. HELPER FUNCTIONS ----------------
+
+def _make_qr(ticket_text: str) -> segno.QRCode:
+    """
+    Encodes the ticket text into a QR code matrix.
+    """
+    # Tickets are scanned off a screen, so the lowest error correction
+    # level is enough; boost_error=False stops segno raising it again.
+    # A fixed mask skips scoring all eight candidates, which is most of
+    # the encode time; any mask still gives a spec-valid code.
+    return segno.make_qr(ticket_text, error="l", boost_error=False, mask=0)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def generate_qr_svg(ticket_text: str) -> str:
+    """
+    Generates an inline SVG QR code for on-screen display.
+    The SVG has no fixed size, so it scales to its container.
+    Returns: The QR code as SVG markup.
+    """
+    # SVG is written straight from the module matrix, so there is no
+    # rasterization or zlib pass. light="#fff" paints the light modules
+    # and quiet zone, otherwise they are transparent and the code is
+    # unreadable on a dark theme.
+    return _make_qr(ticket_text).svg_inline(omitsize=True, border=4, light="#fff")
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def generate_qr_code(ticket_text: str, box_size: int = 10) -> bytes:
+    """
+    Generates a QR code image from the provided text.
+    Cached on (ticket_text, box_size), so reruns skip the encode.
+    Returns: The PNG image as raw bytes.
+    """
+    qr = _make_qr(ticket_text)
+
+    # segno writes the PNG itself, without going through PIL. The
+    # image is a couple of KB, so the fastest zlib level is worth
+    # more than a tighter file.
+    buffer = BytesIO()
+    qr.save(buffer, kind="png", scale=box_size, border=4, compresslevel=1)
+
+    return buffer.getvalue()